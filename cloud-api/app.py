@@ -14,9 +14,15 @@ import time
 import cv2
 import numpy as np
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 import logging
 
+try:
+    import orjson  # Optionnel: encodage JSON accéléré
+except ImportError:
+    orjson = None
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,6 +30,19 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)  # Permet les requêtes cross-origin
 
+# Sérialisation JSON des réponses avec orjson si disponible (plus rapide que json)
+if orjson is not None:
+    class OrjsonProvider(JSONProvider):
+        """Fournisseur JSON Flask basé sur orjson"""
+        
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj).decode('utf-8')
+        
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+    
+    app.json = OrjsonProvider(app)
+
 # Variables globales
 model = None
 model_loading = False
@@ -91,15 +110,21 @@ def health_check():
 @app.route('/detect', methods=['POST'])
 def detect_persons():
     """Endpoint pour la détection de personnes dans une image"""
-    if 'image' not in request.files:
+    # Récupérer l'image depuis la requête: fichier multipart 'image' ou corps brut image/jpeg
+    if 'image' in request.files:
+        img_bytes = request.files['image'].read()
+    elif request.mimetype == 'image/jpeg':
+        img_bytes = request.get_data()
+    else:
         return jsonify({"error": "Aucune image n'a été envoyée"}), 400
     
-    # Récupérer l'image depuis la requête
-    file = request.files['image']
-    img_bytes = file.read()
-    
-    # Seuil de confiance et autres paramètres (peuvent être envoyés dans la requête)
-    confidence = float(request.form.get('confidence', 0.25))
+    # Seuil de confiance et autres paramètres (formulaire ou paramètre d'URL)
+    # Taille d'inférence (640 par défaut); le tracker envoie des images 320x240 et demande 320
+    try:
+        confidence = float(request.values.get('confidence', 0.25))
+        imgsz = min(max(int(request.values.get('imgsz', 640)), 32), 1280)
+    except ValueError:
+        return jsonify({"error": "Paramètre confidence ou imgsz invalide"}), 400
     
     # Charger le modèle si ce n'est pas déjà fait
     if not model_loaded and not load_model():
@@ -117,7 +142,7 @@ def detect_persons():
         start_time = time.time()
         
         # Exécuter l'inférence
-        results = model(img, conf=confidence, classes=0, verbose=False)  # classe 0 = personne
+        results = model(img, conf=confidence, classes=0, imgsz=imgsz, verbose=False)  # classe 0 = personne
         
         inference_time = time.time() - start_time
         logger.info(f"Inférence effectuée en {inference_time:.4f} secondes")
@@ -126,37 +151,29 @@ def detect_persons():
         detections = []
         
         for result in results:
-            boxes = result.boxes.cpu().numpy()
+            # Un seul transfert tenseur -> numpy: colonnes x1, y1, x2, y2, [id de suivi], confiance, classe
+            data = result.boxes.data.cpu().numpy()
+            data = data[data[:, -1] == 0]  # classe 0 = personne
+            boxes_xyxy = data[:, :4].astype(int).tolist()
+            scores = data[:, -2].tolist()
             
-            for box in boxes:
-                # Obtenir l'ID de classe
-                class_id = int(box.cls[0])
-                
-                # Si l'objet détecté est une personne (classe 0)
-                if class_id == 0:
-                    # Obtenir les coordonnées de la boîte
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    
-                    # Obtenir le score de confiance
-                    confidence_score = float(box.conf[0])
-                    
-                    # Ajouter à la liste des détections
-                    detection = {
-                        "class_id": class_id,
-                        "class_name": "person",
-                        "confidence": confidence_score,
-                        "bbox": {
-                            "x1": x1,
-                            "y1": y1,
-                            "x2": x2,
-                            "y2": y2,
-                            "width": x2 - x1,
-                            "height": y2 - y1,
-                            "center_x": (x1 + x2) // 2,
-                            "center_y": (y1 + y2) // 2
-                        }
+            for (x1, y1, x2, y2), confidence_score in zip(boxes_xyxy, scores):
+                # Ajouter à la liste des détections
+                detections.append({
+                    "class_id": 0,
+                    "class_name": "person",
+                    "confidence": confidence_score,
+                    "bbox": {
+                        "x1": x1,
+                        "y1": y1,
+                        "x2": x2,
+                        "y2": y2,
+                        "width": x2 - x1,
+                        "height": y2 - y1,
+                        "center_x": (x1 + x2) // 2,
+                        "center_y": (y1 + y2) // 2
                     }
-                    detections.append(detection)
+                })
         
         # Préparer la réponse
         response = {
@@ -9,39 +9,110 @@ import os
 import threading
 import socket
 import argparse
+import signal
 import sys
 import traceback
 import platform
+import atexit
+import collections
+import concurrent.futures
+import logging
+import logging.handlers
+import queue
 import requests
 from io import BytesIO
 from flask import Flask, Response, render_template_string, request, jsonify, send_from_directory
 from flask_cors import CORS
 
+try:
+    from waitress import serve as waitress_serve  # Optional: production WSGI server for the web interface
+except ImportError:
+    waitress_serve = None
+
+try:
+    from turbojpeg import TurboJPEG  # Optional: direct libjpeg-turbo encoder for the web stream
+    turbo_jpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    turbo_jpeg = None  # Module absent or libturbojpeg not found: fall back to cv2.imencode
+
+try:
+    import orjson  # Optional: faster JSON decoding of cloud API responses
+except ImportError:
+    orjson = None
+
 # Constants
 BARK_DISTANCE = 70  # Distance in cm to start barking
 PURSUE_DISTANCE = 200  # Distance in cm to start pursuing
 MAX_PURSUIT_DISTANCE = 400  # Maximum pursuit distance
 EXPLOSION_DISTANCE = 20  # Distance in cm to trigger explosion warning
+EXPLOSION_RESET_DISTANCE = 25  # Distance in cm the target must back off to before the warning can fire again
 FPS_TARGET = 5  # Lower target FPS to save CPU resources
 DETECTION_INTERVAL = 0.2  # Interval between detections in seconds
 CONFIDENCE_THRESHOLD = 0.25  # Confidence threshold for detection
 PERFORMANCE_MODE = "balanced"  # Options: "performance", "balanced", "quality"
 DETECTION_PERSISTENCE = 10  # Number of frames to keep detection visible
+MOTION_GATE_SIZE = (80, 60)  # Size of the grayscale thumbnail compared between detections
+MOTION_THRESHOLD = 2.0  # Mean absolute thumbnail difference (0-255) below which the scene is static
+MOTION_GATE_MAX_SKIP = 2.0  # Seconds: detection still runs at least this often on a static scene
 CLOUD_API_TIMEOUT = 3  # Timeout for cloud API requests in seconds
 MAX_RETRIES = 3  # Maximum number of retries for cloud API
 USE_LOCAL_FALLBACK = True  # Use local model as fallback if cloud fails
+YOLO_WEIGHTS = "yolov8n.pt"  # Use the smallest model for best performance
+YOLO_INT8_ONNX = "yolov8n_int8.onnx"  # Optional INT8-quantized ONNX export, used first if present
+YOLO_NCNN_DIR = "yolov8n_ncnn_model"  # NCNN export of YOLO_WEIGHTS (ARM NEON FP16 kernels), created on first use
+LOCAL_IMGSZ = 320  # Inference size of the local model (the NCNN export is fixed to this size), also requested from the cloud API
+MODEL_WARMUP_RUNS = 3  # Dummy inferences run right after loading the local model
+LOCAL_BACKENDS = ("onnx", "ncnn", "pytorch")  # Local backends tried in order until one completes an inference
+CLOUD_JPEG_PARAMS = [int(cv2.IMWRITE_JPEG_QUALITY), 70]  # JPEG settings for frames uploaded to the cloud API
+STREAM_JPEG_QUALITY = 60  # JPEG quality of the MJPEG web stream
+STREAM_JPEG_PARAMS = [int(cv2.IMWRITE_JPEG_QUALITY), STREAM_JPEG_QUALITY]  # Same setting for cv2.imencode
+STREAM_FPS = 10  # Maximum number of frames per second encoded for the web stream
+CAMERA_WIDTH = 320  # Capture resolution requested from the camera driver (matches LOCAL_IMGSZ)
+CAMERA_HEIGHT = 240
+HUD_REFERENCE_HEIGHT = 480  # Frame height the HUD positions and font sizes are written for (scaled to the real frame)
+CAPTURE_INTERVAL = 0.05  # Seconds between decoded camera frames (frames in between are only grabbed)
+FRAME_RING_SIZE = 4  # Number of preallocated capture buffers reused by the camera thread
+CAPTURE_CPU = 3  # CPU core reserved for the camera capture thread (if available)
+ENCODER_CPU = 2  # CPU core reserved for the stream JPEG encoder thread (if available)
+DISTANCE_POLL_INTERVAL = 0.05  # Seconds between two readings of the distance polling thread
+DISTANCE_MAX_AGE = 1.0  # Seconds a previous distance reading may stand in for an invalid one
+SHUTDOWN_WAIT_TIMEOUT = 2.0  # Max seconds to wait for servos to settle when shutting down
+RGB_SHUTDOWN_TIMEOUT = 0.2  # Max seconds to wait for the LED strip to switch off when shutting down
+SOUND_GAP = 0.2  # Seconds between the sounds of a queued sequence (e.g. growl then bark)
+WEB_SERVER_THREADS = 8  # Worker threads of the waitress web server (each MJPEG client holds one)
+LOG_EVERY_N_FRAMES = 50  # Per-frame status messages are only logged once every N main-loop iterations
+
+# Configuration du logging (niveau réglable via PIDOG_LOG, ex: PIDOG_LOG=DEBUG)
+# Les appels de log ne font qu'empiler dans une file; un thread d'écoute écrit sur stderr
+log_queue = queue.SimpleQueue()
+logging.basicConfig(level=os.environ.get("PIDOG_LOG", "INFO"), handlers=[logging.handlers.QueueHandler(log_queue)])
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+log_listener.start()
+atexit.register(log_listener.stop)
+logger = logging.getLogger(__name__)
 
 # Global variables for web streaming
 app = Flask(__name__)
 CORS(app)  # Autoriser les requêtes cross-origin
 outputFrame = None
+outputJpeg = None  # Latest JPEG-encoded frame served by /video_feed
+outputJpegSeq = 0  # Incremented with each new outputJpeg so every stream client sends each frame exactly once
 lock = threading.Lock()
+frame_ready = threading.Condition(lock)  # Notified each time a new JPEG is stored in outputJpeg
+shutdown_event = threading.Event()  # Set on Ctrl-C / SIGTERM to stop the main loop
+# Un seul worker (thread démon): les mouvements s'exécutent dans l'ordre, jamais deux à la fois,
+# et un mouvement bloqué n'empêche pas le programme de se terminer
+action_queue = queue.SimpleQueue()  # (function, argument) pairs run by the action worker thread
+pursuit_idle = threading.Event()  # Set when no automatic pursuit step is queued or running
+pursuit_idle.set()
 latest_distance = 100  # Valeur par défaut
+latest_distance_time = 0.0  # time.monotonic() of the last valid distance reading
 auto_mode = False  # Start in manual mode for testing
 my_dog = None  # Global variable for PiDog instance
 camera_available = True  # Flag to track camera availability
 model = None  # Will hold local YOLO model if available as fallback
 cloud_api_url = None  # URL of the cloud API
+cloud_session = requests.Session()  # Keep-alive connection reused across cloud API requests
 last_cloud_request_time = 0  # Time of last cloud API request
 cloud_api_success_count = 0  # Counter for successful cloud API requests
 cloud_api_failure_count = 0  # Counter for failed cloud API requests
@@ -51,15 +122,47 @@ current_detections = []  # Current person detections
 largest_person_bbox = None  # Current largest person bounding box
 last_detection_confidence = 0.0  # Confidence of last detection
 frames_since_last_detection = 0  # Frames since last successful detection
+person_detection_count = 0  # Successful person detections, used to rate-limit their logging
 
 # Available components flags
 has_rgb = True
 has_imu = True
 has_camera = True
 
+# PiDog methods bound once at startup instead of hasattr()/attribute lookups on every command
+dog_speak = None
+rgb_set_mode = None
+sound_queue = queue.SimpleQueue()  # Sound sequences played by the sound worker thread
+
 # Distance sensor variables
 ultrasonic_attribute = None
 read_distance_method = None
+distance_reader = None  # Bound read method resolved once by setup_distance_sensor
+
+# Bounded frame buffer between the frame producers and the stream encoder
+class FrameBuffer:
+    """Drop-oldest frame buffer: deque appends/pops are atomic, an Event wakes the consumer"""
+    
+    def __init__(self, size):
+        self.frames = collections.deque(maxlen=size)
+        self.ready = threading.Event()
+    
+    def put(self, frame):
+        """Add a frame, silently discarding the oldest one when full"""
+        self.frames.append(frame)
+        self.ready.set()
+    
+    def get(self):
+        """Block until a frame is available and return the oldest one"""
+        while True:
+            try:
+                return self.frames.popleft()
+            except IndexError:
+                self.ready.wait()
+                self.ready.clear()
+
+stream_frames = FrameBuffer(2)  # Frames waiting for the stream encoder
+detection_frames = FrameBuffer(1)  # Latest frame waiting for the detection worker
 
 # Function to send image to cloud API for detection
 def detect_persons_cloud(image, retry_count=0):
@@ -67,7 +170,7 @@ def detect_persons_cloud(image, retry_count=0):
     global cloud_api_url, cloud_api_success_count, cloud_api_failure_count, last_cloud_request_time
     
     if cloud_api_url is None:
-        print("Cloud API URL not set")
+        logger.warning("Cloud API URL not set")
         return None
     
     # Record time of request
@@ -75,97 +178,125 @@ def detect_persons_cloud(image, retry_count=0):
     
     try:
         # Compress the image to JPEG to reduce size
-        _, img_encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 70])
+        _, img_encoded = cv2.imencode('.jpg', image, CLOUD_JPEG_PARAMS)
         img_bytes = img_encoded.tobytes()
         
-        # Prepare the request
-        files = {'image': ('image.jpg', img_bytes, 'image/jpeg')}
-        data = {'confidence': str(CONFIDENCE_THRESHOLD)}
-        
-        # Send the request to the cloud API
-        response = requests.post(
+        # Send the raw JPEG as the request body (no multipart encoding pass)
+        response = cloud_session.post(
             f"{cloud_api_url}/detect", 
-            files=files, 
-            data=data, 
+            data=img_bytes, 
+            params={'confidence': str(CONFIDENCE_THRESHOLD), 'imgsz': str(LOCAL_IMGSZ)}, 
+            headers={'Content-Type': 'image/jpeg'}, 
             timeout=CLOUD_API_TIMEOUT
         )
         
         # Check if the request was successful
         if response.status_code == 200:
             cloud_api_success_count += 1
+            if orjson is not None:
+                return orjson.loads(response.content)
             return response.json()
         else:
-            print(f"Cloud API error: {response.status_code} - {response.text}")
+            logger.warning("Cloud API error: %s - %s", response.status_code, response.text)
             cloud_api_failure_count += 1
             
             # Retry if not reached max retries
             if retry_count < MAX_RETRIES:
-                print(f"Retrying cloud API request ({retry_count + 1}/{MAX_RETRIES})...")
+                logger.info("Retrying cloud API request (%d/%d)...", retry_count + 1, MAX_RETRIES)
                 time.sleep(0.5)  # Wait before retrying
                 return detect_persons_cloud(image, retry_count + 1)
             
             return None
             
     except requests.exceptions.RequestException as e:
-        print(f"Error connecting to cloud API: {e}")
+        logger.warning("Error connecting to cloud API: %s", e)
         cloud_api_failure_count += 1
         
         # Retry if not reached max retries
         if retry_count < MAX_RETRIES:
-            print(f"Retrying cloud API request ({retry_count + 1}/{MAX_RETRIES})...")
+            logger.info("Retrying cloud API request (%d/%d)...", retry_count + 1, MAX_RETRIES)
             time.sleep(0.5)  # Wait before retrying
             return detect_persons_cloud(image, retry_count + 1)
         
         return None
 
 # Function to detect persons using local model (fallback)
+def open_local_model(backend):
+    """Open one local YOLOv8 backend, or None if its file is not available"""
+    from ultralytics import YOLO
+    
+    # Modèle quantifié INT8 (onnxruntime, CPU): le plus rapide sur ARM, mais il doit être fourni
+    if backend == "onnx":
+        if not os.path.isfile(YOLO_INT8_ONNX):
+            return None
+        logger.info("Loading INT8 ONNX model %s", YOLO_INT8_ONNX)
+        return YOLO(YOLO_INT8_ONNX, task="detect")
+    if backend == "ncnn":
+        if not os.path.isdir(YOLO_NCNN_DIR):
+            logger.info("Exporting YOLOv8 model to NCNN (one-time, may take a minute)...")
+            YOLO(YOLO_WEIGHTS).export(format="ncnn", half=True, imgsz=LOCAL_IMGSZ)
+        logger.info("Loading NCNN model %s", YOLO_NCNN_DIR)
+        return YOLO(YOLO_NCNN_DIR, task="detect")
+    logger.info("Loading PyTorch weights %s", YOLO_WEIGHTS)
+    return YOLO(YOLO_WEIGHTS)
+
+def load_local_model():
+    """Load the first local YOLOv8 backend that runs, warmed up so the first real frame is not slowed down"""
+    dummy = np.zeros((LOCAL_IMGSZ, LOCAL_IMGSZ, 3), dtype=np.uint8)
+    for backend in LOCAL_BACKENDS:
+        try:
+            local_model = open_local_model(backend)
+            if local_model is None:
+                continue
+            # Ultralytics ne construit le backend qu'à la première inférence: un fichier ONNX/NCNN
+            # invalide (ou onnxruntime absent) n'échoue qu'ici, d'où le warm-up dans le try
+            for _ in range(MODEL_WARMUP_RUNS):
+                local_model(dummy, imgsz=LOCAL_IMGSZ, classes=0, verbose=False)
+            return local_model
+        except Exception as e:
+            logger.warning("%s backend unusable, trying the next one: %s", backend, e)
+    raise RuntimeError("No local YOLOv8 backend could run an inference")
+
 def detect_persons_local(image):
     """Detect persons using local YOLOv8 model (fallback)"""
     global model
     
     if model is None:
-        print("Local model not available for fallback")
+        logger.warning("Local model not available for fallback")
         return None
     
     try:
         # Run YOLOv8 inference on the frame
-        results = model(image, conf=CONFIDENCE_THRESHOLD, classes=0, verbose=False)  # Class 0 = person
+        # stream=True yields each Results object lazily instead of building and keeping the full list
+        results = model.predict(image, conf=CONFIDENCE_THRESHOLD, classes=0, imgsz=LOCAL_IMGSZ, stream=True, verbose=False)  # Class 0 = person
         
         # Process results to match cloud API format
         detections = []
         
         for result in results:
-            boxes = result.boxes.cpu().numpy()
+            # A single tensor -> numpy transfer: columns x1, y1, x2, y2, [track id], confidence, class
+            data = result.boxes.data.cpu().numpy()
+            data = data[data[:, -1] == 0]  # Class 0 = person
+            boxes_xyxy = data[:, :4].astype(int).tolist()
+            scores = data[:, -2].tolist()
             
-            for box in boxes:
-                # Get class ID
-                class_id = int(box.cls[0])
-                
-                # If the detected object is a person
-                if class_id == 0:
-                    # Get bounding box coordinates
-                    x1, y1, x2, y2 = map(int, box.xyxy[0])
-                    
-                    # Get confidence score
-                    confidence_score = float(box.conf[0])
-                    
-                    # Add to detections list
-                    detection = {
-                        "class_id": class_id,
-                        "class_name": "person",
-                        "confidence": confidence_score,
-                        "bbox": {
-                            "x1": x1,
-                            "y1": y1,
-                            "x2": x2,
-                            "y2": y2,
-                            "width": x2 - x1,
-                            "height": y2 - y1,
-                            "center_x": (x1 + x2) // 2,
-                            "center_y": (y1 + y2) // 2
-                        }
+            for (x1, y1, x2, y2), confidence_score in zip(boxes_xyxy, scores):
+                # Add to detections list
+                detections.append({
+                    "class_id": 0,
+                    "class_name": "person",
+                    "confidence": confidence_score,
+                    "bbox": {
+                        "x1": x1,
+                        "y1": y1,
+                        "x2": x2,
+                        "y2": y2,
+                        "width": x2 - x1,
+                        "height": y2 - y1,
+                        "center_x": (x1 + x2) // 2,
+                        "center_y": (y1 + y2) // 2
                     }
-                    detections.append(detection)
+                })
         
         return {
             "success": True,
@@ -177,14 +308,14 @@ def detect_persons_local(image):
         }
         
     except Exception as e:
-        print(f"Error in local detection: {e}")
+        logger.error("Error in local detection: %s", e)
         traceback.print_exc()
         return None
 
 # Function to process detection results
 def process_detection_results(results, current_frame):
     """Process detection results and update tracking variables"""
-    global largest_person_bbox, last_detection_confidence, frames_since_last_detection, current_detections
+    global largest_person_bbox, last_detection_confidence, frames_since_last_detection, current_detections, person_detection_count
     
     if results is None or not results.get("success", False):
         # No successful detection
@@ -204,23 +335,117 @@ def process_detection_results(results, current_frame):
         return
     
     # Find the largest person (closest)
-    largest_area = 0
-    largest_detection = None
+    largest_detection = max(detections, key=lambda d: d["bbox"]["width"] * d["bbox"]["height"])
     
-    for detection in detections:
-        bbox = detection["bbox"]
-        area = bbox["width"] * bbox["height"]
-        
-        if area > largest_area:
-            largest_area = area
-            largest_detection = detection
-    
-    if largest_detection:
+    if largest_detection["bbox"]["width"] * largest_detection["bbox"]["height"] > 0:
         bbox = largest_detection["bbox"]
         largest_person_bbox = [bbox["x1"], bbox["y1"], bbox["x2"], bbox["y2"]]
         last_detection_confidence = largest_detection["confidence"]
         frames_since_last_detection = 0
-        print(f"Person detected! Confidence: {last_detection_confidence:.2f}")
+        person_detection_count += 1
+        # Jusqu'à 5 détections par seconde: seulement la première puis une sur LOG_EVERY_N_FRAMES
+        if person_detection_count % LOG_EVERY_N_FRAMES == 1:
+            logger.info("Person detected! Confidence: %.2f (%d detections)", last_detection_confidence, person_detection_count)
+
+# Détection complète (cloud puis modèle local en secours)
+def detect_persons(image, local_fallback):
+    """Detect persons using the cloud API or the local model, returns the results dict or None"""
+    if cloud_api_url:
+        # Try cloud API
+        cloud_results = detect_persons_cloud(image)
+        if cloud_results:
+            return cloud_results
+        if local_fallback and model is not None:
+            # Fallback to local model
+            logger.info("Cloud API failed, falling back to local model")
+            return detect_persons_local(image)
+        return None
+    if model is not None:
+        # Use local model directly
+        return detect_persons_local(image)
+    return None
+
+def detection_worker(local_fallback):
+    """Run detection on the latest submitted frame, off the tracking loop"""
+    while not shutdown_event.is_set():
+        frame = detection_frames.get()
+        if frame is None:
+            break
+        results = detect_persons(frame, local_fallback)
+        process_detection_results(results, frame)
+
+# Pin the calling thread to a dedicated core to keep its cache warm
+def pin_current_thread(cpu):
+    """Pin the calling thread to one CPU core (Linux only), returns True on success"""
+    if not hasattr(os, 'sched_setaffinity'):
+        return False
+    
+    try:
+        # Sur Linux, le pid 0 désigne le thread appelant
+        if cpu not in os.sched_getaffinity(0):
+            return False
+        os.sched_setaffinity(0, {cpu})
+        return True
+    except OSError as e:
+        logger.warning("Could not pin thread to CPU %s: %s", cpu, e)
+        return False
+
+# Serveur web de l'interface de contrôle
+def run_web_server(port):
+    """Serve the Flask app with waitress if installed, else with the threaded Werkzeug server"""
+    if waitress_serve is not None:
+        waitress_serve(app, host='0.0.0.0', port=port, threads=WEB_SERVER_THREADS)
+    else:
+        app.run(host='0.0.0.0', port=port, debug=False, use_reloader=False, threaded=True)
+
+# Démarrer un thread de travail en arrière-plan
+def start_worker(name, target, cpu=None):
+    """Start a named daemon thread running target (pinned to cpu if given) and return it"""
+    if cpu is not None:
+        # Le thread s'épingle lui-même avant de démarrer son travail
+        def run():
+            pin_current_thread(cpu)
+            target()
+    else:
+        run = target
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
+
+# Exécuter un appel matériel sans risquer de bloquer l'arrêt
+def call_with_timeout(func, *args, timeout=SHUTDOWN_WAIT_TIMEOUT, **kwargs):
+    """Run a blocking hardware call, giving up after timeout seconds (returns False)"""
+    # The PiDog calls have no timeout of their own, so run them on a throwaway daemon thread
+    worker = threading.Thread(target=func, args=args, kwargs=kwargs)
+    worker.daemon = True
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        logger.warning("%s still running after %ss, continuing shutdown", getattr(func, '__name__', func), timeout)
+        return False
+    return True
+
+# Texte du HUD: positions et tailles écrites pour 640x480, mises à l'échelle de l'image réelle
+def draw_hud_text(frame, text, org, font_scale, color=(0, 0, 255), thickness=2):
+    """Draw HUD text laid out for HUD_REFERENCE_HEIGHT, scaled to the frame size"""
+    hud_scale = frame.shape[0] / HUD_REFERENCE_HEIGHT
+    cv2.putText(frame, text, (int(org[0] * hud_scale), int(org[1] * hud_scale)),
+                cv2.FONT_HERSHEY_SIMPLEX, font_scale * hud_scale, color, max(1, round(thickness * hud_scale)))
+
+def draw_explosion_overlay(frame, text="⚠️ EXPLOSION ⚠️"):
+    """Draw the explosion border and centred text, shrunk to fit the frame width"""
+    height, width = frame.shape[:2]
+    hud_scale = height / HUD_REFERENCE_HEIGHT
+    cv2.rectangle(frame, (0, 0), (width, height), (0, 0, 255), max(1, int(20 * hud_scale)))
+    thickness = max(1, round(3 * hud_scale))
+    font_scale = 1.5 * hud_scale
+    text_width = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)[0][0]
+    # Garder le texte dans 90 % de la largeur
+    font_scale = min(font_scale, font_scale * 0.9 * width / text_width)
+    text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)[0]
+    text_x = max(0, (width - text_size[0]) // 2)
+    text_y = (height + text_size[1]) // 2
+    cv2.putText(frame, text, (text_x, text_y), cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 255, 255), thickness)
 
 # Get the local IP address
 def get_local_ip():
@@ -231,7 +456,7 @@ def get_local_ip():
         ip = s.getsockname()[0]
         s.close()
         return ip
-    except:
+    except OSError:
         return "127.0.0.1"  # Fallback to localhost
 
 # HTML template for the web interface (updated with simpler design and no video if camera unavailable)
@@ -430,7 +655,7 @@ HTML_TEMPLATE = """
             fetch('/distance')
                 .then(response => response.json())
                 .then(data => {
-                    document.getElementById('distance').textContent = data.distance;
+                    document.getElementById('distance').textContent = data.distance !== null ? data.distance : '--';
                     
                     // Check for explosion warning
                     if (data.explosion_warning) {
@@ -536,7 +761,7 @@ HTML_TEMPLATE = """
 
 # Fonction pour configurer la lecture du capteur de distance
 def setup_distance_sensor(dog, debug=False):
-    global ultrasonic_attribute, read_distance_method
+    global ultrasonic_attribute, read_distance_method, distance_reader
     
     # Vérifier les attributs du PiDog pour trouver le capteur ultrasonique
     if hasattr(dog, 'ultrasonic'):
@@ -569,16 +794,19 @@ def setup_distance_sensor(dog, debug=False):
                 test_value = sensor.read_distance()
                 print(f"Lecture de test via {ultrasonic_attribute}.read_distance(): {test_value}")
                 read_distance_method = "standard"
+                distance_reader = sensor.read_distance
                 test_successful = True
             elif hasattr(sensor, 'read'):
                 test_value = sensor.read()
                 print(f"Lecture de test via {ultrasonic_attribute}.read(): {test_value}")
                 read_distance_method = "read"
+                distance_reader = sensor.read
                 test_successful = True
             elif hasattr(sensor, 'get_distance'):
                 test_value = sensor.get_distance()
                 print(f"Lecture de test via {ultrasonic_attribute}.get_distance(): {test_value}")
                 read_distance_method = "get_distance"
+                distance_reader = sensor.get_distance
                 test_successful = True
         
         # Si les méthodes standards échouent, essayer d'accéder directement
@@ -587,12 +815,14 @@ def setup_distance_sensor(dog, debug=False):
             print(f"Lecture de test via dog.read_distance(): {test_value}")
             ultrasonic_attribute = None
             read_distance_method = "direct_read_distance"
+            distance_reader = dog.read_distance
             test_successful = True
         elif not test_successful and hasattr(dog, 'get_distance'):
             test_value = dog.get_distance()
             print(f"Lecture de test via dog.get_distance(): {test_value}")
             ultrasonic_attribute = None
             read_distance_method = "direct_get_distance"
+            distance_reader = dog.get_distance
             test_successful = True
             
     except Exception as e:
@@ -603,44 +833,93 @@ def setup_distance_sensor(dog, debug=False):
 
 # Fonction pour lire la distance selon la méthode détectée
 def read_distance_sensor():
-    global my_dog, ultrasonic_attribute, read_distance_method
+    # La méthode de lecture est résolue une seule fois dans setup_distance_sensor
+    if distance_reader is None:
+        return None
     
     try:
-        if ultrasonic_attribute:
-            sensor = getattr(my_dog, ultrasonic_attribute)
-            if read_distance_method == "standard":
-                return sensor.read_distance()
-            elif read_distance_method == "read":
-                return sensor.read()
-            elif read_distance_method == "get_distance":
-                return sensor.get_distance()
+        return distance_reader()
+    except Exception:
+        return None
+
+# Fonction pour lire la distance de manière fiable
+def get_reliable_distance(valid_range=(0, 1000)):
+    """Single sensor reading, or None if it is invalid (get_cached_distance covers the gaps)"""
+    value = read_distance_sensor()
+    if value is not None and isinstance(value, (int, float)) and value > valid_range[0] and value < valid_range[1]:
+        return round(float(value), 2)
+    return None
+
+# Tests des composants au démarrage (exécutés en parallèle par main)
+def probe_imu(dog):
+    """Stand up to check the IMU, returns True if it worked"""
+    # Try to stand - this will fail if IMU is not working
+    try:
+        dog.do_action('stand', speed=300)
+        dog.wait_all_done()
+        print("Stand action successful - IMU working")
+        return True
+    except Exception as e:
+        print(f"Warning: Could not perform stand action: {e}")
+        traceback.print_exc()
+        return False
+
+def probe_rgb(dog):
+    """Flash the LED strip, returns its bound set_mode or None if unusable"""
+    try:
+        # Try to access the rgb_strip attribute
+        if hasattr(dog, 'rgb_strip'):
+            # Try to use it
+            try:
+                dog.rgb_strip.set_mode('breath', 'red', delay=0.1)
+                time.sleep(0.5)
+                print("RGB strip working")
+                return dog.rgb_strip.set_mode
+            except Exception as e:
+                print(f"Warning: RGB strip exists but failed to use: {e}")
+                traceback.print_exc()
         else:
-            if read_distance_method == "direct_read_distance":
-                return my_dog.read_distance()
-            elif read_distance_method == "direct_get_distance":
-                return my_dog.get_distance()
-    except:
-        pass
-    
+            print("Warning: RGB strip not available on this PiDog")
+    except Exception as e:
+        print(f"Error checking RGB: {e}")
+        traceback.print_exc()
     return None
 
-# Fonction pour lire la distance de manière fiable
-def get_reliable_distance(max_attempts=3, valid_range=(0, 1000)):
-    readings = []
-    
-    for _ in range(max_attempts):
-        try:
-            value = read_distance_sensor()
-            if value is not None and isinstance(value, (int, float)) and value > valid_range[0] and value < valid_range[1]:
-                readings.append(value)
-        except:
-            pass
-        time.sleep(0.01)
-    
-    if readings:
-        return round(sum(readings) / len(readings), 2)
-    else:
-        return None
+def probe_speaker(dog):
+    """Play the boot sound, returns the bound speak method or None if missing"""
+    speak = getattr(dog, 'speak', None)
+    try:
+        if speak is not None:
+            speak('boot', 100)  # Less aggressive startup sound
+            time.sleep(0.5)
+            print("Speaker working")
+        else:
+            print("Warning: speak method not found")
+    except Exception as e:
+        print(f"Warning: Could not play sound: {e}")
+        traceback.print_exc()
+    return speak
+
+# Lecture du capteur en continu dans un thread dédié
+def poll_distance():
+    """Read the distance sensor continuously and publish valid readings in latest_distance"""
+    global latest_distance, latest_distance_time
+    while not shutdown_event.is_set():
+        distance = get_reliable_distance()
+        if distance is not None:
+            # Valeur d'abord, horodatage ensuite: un lecteur qui voit le nouvel horodatage voit aussi la nouvelle valeur
+            latest_distance = distance
+            latest_distance_time = time.monotonic()
+        shutdown_event.wait(DISTANCE_POLL_INTERVAL)
+
+def get_cached_distance():
+    """Latest distance published by poll_distance, or None if it is too old"""
+    # Lire l'horodatage avant la valeur (ordre inverse de poll_distance)
+    reading_time = latest_distance_time
+    distance = latest_distance
+    if distance is not None and time.monotonic() - reading_time < DISTANCE_MAX_AGE:
+        return distance
+    return None
 
 def main():
     # Parse command line arguments
@@ -658,16 +937,17 @@ def main():
     args = parser.parse_args()
     
     # For global access
-    global latest_distance, auto_mode, outputFrame, my_dog, has_rgb, has_imu, has_camera, model, cloud_api_url
+    global auto_mode, outputFrame, my_dog, has_rgb, has_imu, has_camera, dog_speak, rgb_set_mode, model, cloud_api_url
+    global frames_since_last_detection
     
     # Set cloud API URL
     cloud_api_url = args.cloud_api
     if cloud_api_url:
         print(f"Using cloud API for detection: {cloud_api_url}")
         
-        # Test cloud API connection
+        # Test cloud API connection (same session: the TCP/TLS connection is reused by the first /detect)
         try:
-            response = requests.get(f"{cloud_api_url}/health", timeout=5)
+            response = cloud_session.get(f"{cloud_api_url}/health", timeout=5)
             if response.status_code == 200:
                 print("Cloud API connection successful!")
                 print(f"API status: {response.json()}")
@@ -677,16 +957,18 @@ def main():
             print(f"Cloud API connection failed: {e}")
             print("Will attempt to use it anyway or fall back to local model if enabled.")
     
-    # Diagnostic: CPU info
-    try:
-        import psutil
-        cpu_count = psutil.cpu_count()
-        cpu_freq = psutil.cpu_freq()
-        memory = psutil.virtual_memory()
-        print(f"DIAGNOSTIC - CPU: {cpu_count} cores, Freq: {cpu_freq.current if cpu_freq else 'Unknown'} MHz")
-        print(f"DIAGNOSTIC - Memory: Total={memory.total/1024/1024:.1f}MB, Available={memory.available/1024/1024:.1f}MB ({memory.percent}% used)")
-    except:
-        print("DIAGNOSTIC - Couldn't get system info")
+    # Diagnostic: CPU info (psutil is only imported when the DEBUG output will be shown)
+    if logger.isEnabledFor(logging.DEBUG):
+        try:
+            import psutil
+            cpu_count = psutil.cpu_count()
+            cpu_freq = psutil.cpu_freq()
+            memory = psutil.virtual_memory()
+            logger.debug("DIAGNOSTIC - CPU: %s cores, Freq: %s MHz", cpu_count, cpu_freq.current if cpu_freq else 'Unknown')
+            logger.debug("DIAGNOSTIC - Memory: Total=%.1fMB, Available=%.1fMB (%s%% used)",
+                         memory.total / 1024 / 1024, memory.available / 1024 / 1024, memory.percent)
+        except Exception as e:
+            logger.warning("DIAGNOSTIC - Couldn't get system info: %r", e)
     
     # Set performance parameters based on mode
     global DETECTION_INTERVAL, CONFIDENCE_THRESHOLD
@@ -724,52 +1006,28 @@ def main():
         # Configurer le capteur de distance
         sensor_working, test_distance = setup_distance_sensor(my_dog, debug=args.debug)
         if sensor_working:
+            # Le capteur à ultrasons bloque pendant l'écho: il est lu par son propre thread
+            start_worker("distance", poll_distance)
             print(f"Capteur de distance configuré avec succès. Valeur de test: {test_distance}")
         else:
             print("ERREUR: Impossible de configurer le capteur de distance!")
         
-        # Try to stand - this will fail if IMU is not working
-        try:
-            my_dog.do_action('stand', speed=300)
-            my_dog.wait_all_done()
-            print("Stand action successful - IMU working")
-        except Exception as e:
-            print(f"Warning: Could not perform stand action: {e}")
-            traceback.print_exc()
-            has_imu = False
+        # L'IMU, les LEDs et le haut-parleur sont indépendants: les tester en parallèle
+        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+            imu_probe = executor.submit(probe_imu, my_dog)
+            rgb_probe = executor.submit(probe_rgb, my_dog)
+            speaker_probe = executor.submit(probe_speaker, my_dog)
+        has_imu = imu_probe.result()
+        rgb_set_mode = rgb_probe.result()
+        has_rgb = rgb_set_mode is not None
+        dog_speak = speaker_probe.result()
         
-        # Check if RGB strip is available
-        try:
-            # Try to access the rgb_strip attribute
-            if hasattr(my_dog, 'rgb_strip'):
-                # Try to use it
-                try:
-                    my_dog.rgb_strip.set_mode('breath', 'red', delay=0.1)
-                    time.sleep(0.5)
-                    print("RGB strip working")
-                except Exception as e:
-                    print(f"Warning: RGB strip exists but failed to use: {e}")
-                    traceback.print_exc()
-                    has_rgb = False
-            else:
-                print("Warning: RGB strip not available on this PiDog")
-                has_rgb = False
-        except Exception as e:
-            print(f"Error checking RGB: {e}")
-            traceback.print_exc()
-            has_rgb = False
+        # Les sons sont joués par un thread dédié pour ne pas bloquer les requêtes ni la boucle de suivi
+        if dog_speak is not None:
+            start_worker("sound", play_sounds)
         
-        # Check if speaker is available and make a test sound
-        try:
-            if hasattr(my_dog, 'speak'):
-                my_dog.speak('boot', 100)  # Less aggressive startup sound
-                time.sleep(0.5)
-                print("Speaker working")
-            else:
-                print("Warning: speak method not found")
-        except Exception as e:
-            print(f"Warning: Could not play sound: {e}")
-            traceback.print_exc()
+        # Les mouvements (commandes et poursuite) passent par un worker unique
+        action_thread = start_worker("action", run_actions)
     except Exception as e:
         print(f"Critical error initializing PiDog: {e}")
         traceback.print_exc()
@@ -786,8 +1044,7 @@ def main():
             if args.local_fallback and cloud_api_url:
                 try:
                     print("Initializing local YOLOv8 model as fallback...")
-                    from ultralytics import YOLO
-                    model = YOLO("yolov8n.pt")  # Use the smallest model for best performance
+                    model = load_local_model()
                     print("Local YOLOv8 model loaded successfully as fallback")
                 except Exception as e:
                     print(f"Warning: Could not load local YOLO model: {e}")
@@ -796,8 +1053,7 @@ def main():
             elif not cloud_api_url:
                 try:
                     print("Initializing local YOLOv8 model for detection...")
-                    from ultralytics import YOLO
-                    model = YOLO("yolov8n.pt")  # Use the smallest model for best performance
+                    model = load_local_model()
                     print("Local YOLOv8 model loaded successfully")
                 except Exception as e:
                     print(f"Warning: Could not load YOLO model: {e}")
@@ -807,6 +1063,17 @@ def main():
             # Initialize the camera with simpler approach
             cap = cv2.VideoCapture(0)
             
+            # Demander des images MJPEG déjà compressées par la caméra (USB)
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            
+            # Fixer la résolution avant la première lecture pour que le pilote ne démarre pas dans son mode par défaut
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
+            
+            # Ne garder qu'une image dans le tampon du pilote pour toujours lire la plus récente
+            if not cap.set(cv2.CAP_PROP_BUFFERSIZE, 1):
+                print("Warning: could not set CAP_PROP_BUFFERSIZE=1")
+            
             # Wait a moment to allow camera to initialize
             time.sleep(1)
             
@@ -820,8 +1087,7 @@ def main():
                 print(f"Camera initialized successfully. Frame size: {test_frame.shape[1]}x{test_frame.shape[0]}")
                 
                 # Update global frame for web streaming
-                with lock:
-                    outputFrame = test_frame.copy()
+                publish_frame(test_frame.copy())
         except Exception as e:
             print(f"Error initializing camera: {e}")
             traceback.print_exc()
@@ -830,15 +1096,31 @@ def main():
         has_camera = False
         cap = None
     
+    # Arrêt propre sur SIGTERM (systemd stop) via le même chemin que Ctrl-C
+    signal.signal(signal.SIGTERM, lambda *_: shutdown_event.set())
+    # Stopper aussi les threads si main() se termine sur une exception
+    atexit.register(shutdown_event.set)
+    
     # Start the Flask server in a separate thread if web interface is enabled
+    ip_text = None  # Control URL drawn on each frame, built once when the web interface starts
     if args.web:
+        # Résolue une seule fois: l'adresse ne change pas pendant l'exécution
         local_ip = get_local_ip()
+        ip_text = f"Control: http://{local_ip}:{args.port}"
         print(f"Starting web control interface on http://{local_ip}:{args.port}")
-        webThread = threading.Thread(target=lambda: app.run(host='0.0.0.0', port=args.port, debug=False, use_reloader=False, threaded=True))
-        webThread.daemon = True
-        webThread.start()
+        
+        # Threads de l'interface web: (nom, fonction, activé, cœur CPU)
+        # L'encodage JPEG du flux vidéo se fait dans un thread dédié
+        web_workers = [
+            ("web", lambda: run_web_server(args.port), True, None),
+            ("stream-encoder", encode_stream_frames, has_camera, ENCODER_CPU),
+        ]
+        for name, target, enabled, cpu in web_workers:
+            if enabled:
+                start_worker(name, target, cpu=cpu)
     
     # Main loop - only run if camera is available
+    capture_thread = None
     if has_camera and cap is not None:
         print("Starting camera-based tracking.")
         if not args.headless:
@@ -850,267 +1132,305 @@ def main():
         last_fps_display_time = 0
         frame_count = 0
         detection_count = 0
+        loop_count = 0  # Never reset, used to rate-limit per-frame logging
+        pursuit_count = 0  # Pursuit steps requested, used to rate-limit their logging
+        explosion_latched = False  # True while the target stays inside the explosion zone
+        prev_gray = None  # Thumbnail of the last frame submitted for detection (motion gate)
         
         # Thread function pour capturer en continu
         def capture_frames():
             global outputFrame, lock
-            while True:
+            # Buffers préalloués: cap.retrieve() écrit directement dedans au lieu d'allouer
+            # une nouvelle image à chaque capture. Seul le dernier emplacement publié est
+            # lu (copie sous verrou par la boucle principale) et la capture écrit toujours
+            # dans un autre; l'encodeur reçoit sa propre copie (voir publish_frame).
+            frame_ring = [np.empty_like(test_frame) for _ in range(FRAME_RING_SIZE)]
+            write_idx = 0
+            next_deadline = time.monotonic()
+            while not shutdown_event.is_set():
                 try:
                     if cap is None or not cap.isOpened():
-                        print("Camera disconnected, attempting to reconnect...")
+                        logger.warning("Camera disconnected, attempting to reconnect...")
                         time.sleep(2)
                         continue
-                        
-                    # Capture frame-by-frame
-                    ret, frame = cap.read()
+                    
+                    # grab() avance le flux sans décoder: on ne décode (retrieve) que
+                    # la dernière image saisie à chaque échéance
+                    grabbed = cap.grab()
+                    while grabbed and time.monotonic() < next_deadline:
+                        grabbed = cap.grab()
+                    
+                    # Decode the freshest grabbed frame into the next ring slot
+                    ret, frame = cap.retrieve(frame_ring[write_idx]) if grabbed else (False, None)
+                    next_deadline = time.monotonic() + CAPTURE_INTERVAL
                     
                     if not ret or frame is None:
-                        print("Failed to capture frame, retrying...")
+                        logger.warning("Failed to capture frame, retrying...")
                         time.sleep(0.5)
                         continue
                     
-                    # Update the frame for web streaming
-                    with lock:
-                        outputFrame = frame.copy()
-                        
-                    # Reduce CPU usage
-                    time.sleep(0.05)
+                    # Keep the slot if the driver changed resolution and reallocated
+                    frame_ring[write_idx] = frame
+                    
+                    # Update the frame for web streaming (no copy, the slot is published as-is)
+                    publish_frame(frame)
+                    write_idx = (write_idx + 1) % FRAME_RING_SIZE
                 except Exception as e:
-                    print(f"Error in capture thread: {e}")
+                    logger.error("Error in capture thread: %s", e)
                     time.sleep(1)
         
         # Démarrer la capture dans un thread séparé
-        capture_thread = threading.Thread(target=capture_frames)
-        capture_thread.daemon = True
-        capture_thread.start()
+        capture_thread = start_worker("capture", capture_frames, cpu=CAPTURE_CPU)
+        
+        # La détection (requête cloud ou YOLO local) tourne dans son propre thread
+        if cloud_api_url or model is not None:
+            start_worker("detection", lambda: detection_worker(args.local_fallback))
+        
+        # Tampons de travail de la boucle principale, réutilisés comme ceux de la capture
+        # (l'encodeur du flux web reçoit sa propre copie, voir publish_frame)
+        work_ring = [np.empty_like(test_frame) for _ in range(FRAME_RING_SIZE)]
+        work_idx = 0
         
         # Main loop
-        while True:
-            # Control the frame rate
-            time.sleep(1.0/FPS_TARGET)
-            
-            # Get the latest frame
-            current_frame = None
-            with lock:
-                if outputFrame is not None:
-                    current_frame = outputFrame.copy()
+        frame_period = 1.0 / FPS_TARGET
+        next_tick = time.monotonic()
+        try:
+            while not shutdown_event.is_set():
+                # Control the frame rate with a fixed deadline so slow iterations don't add drift
+                # (wakes immediately on shutdown)
+                next_tick += frame_period
+                now = time.monotonic()
+                if next_tick < now - frame_period:
+                    next_tick = now  # Trop en retard: repartir de maintenant au lieu d'enchaîner sans pause
+                if shutdown_event.wait(max(0.0, next_tick - now)):
+                    break
             
-            if current_frame is None:
-                print("No frame available")
-                time.sleep(0.5)
-                continue
+                # Get the latest frame into the next preallocated work buffer (no allocation per frame)
+                current_frame = None
+                with lock:
+                    if outputFrame is not None:
+                        work_frame = work_ring[work_idx]
+                        if work_frame.shape == outputFrame.shape:
+                            np.copyto(work_frame, outputFrame)
+                            current_frame = work_frame
+                            work_idx = (work_idx + 1) % FRAME_RING_SIZE
+                        else:
+                            current_frame = outputFrame.copy()  # Taille inattendue (caméra reconnectée)
             
-            # Count frames for FPS calculation
-            frame_count += 1
-            current_time = time.time()
+                if current_frame is None:
+                    logger.debug("No frame available")
+                    shutdown_event.wait(0.5)
+                    continue
             
-            # Measure processing time
-            start_time = time.time()
+                # Count frames for FPS calculation
+                frame_count += 1
+                loop_count += 1
+                current_time = time.monotonic()  # Single clock read for all interval checks of this iteration
             
-            # Run detection at specified intervals
-            if current_time - last_detection_time >= DETECTION_INTERVAL:
-                detection_count += 1
-                last_detection_time = current_time
-                
-                # Detect persons using cloud API or local fallback
-                if cloud_api_url:
-                    # Try cloud API
-                    cloud_results = detect_persons_cloud(current_frame)
-                    
-                    if cloud_results:
-                        # Process cloud results
-                        process_detection_results(cloud_results, current_frame)
-                    elif args.local_fallback and model is not None:
-                        # Fallback to local model
-                        print("Cloud API failed, falling back to local model")
-                        local_results = detect_persons_local(current_frame)
-                        process_detection_results(local_results, current_frame)
-                elif model is not None:
-                    # Use local model directly
-                    local_results = detect_persons_local(current_frame)
-                    process_detection_results(local_results, current_frame)
-            else:
-                # Not running detection this frame, increment counter
-                frames_since_last_detection += 1
+                # Submit a frame for detection at specified intervals
+                # (the detection worker runs it in the background; if it is still busy the frame replaces the pending one)
+                if current_time - last_detection_time >= DETECTION_INTERVAL:
+                    # Porte de mouvement: sur une scène statique, le dernier résultat (cible ou absence de cible)
+                    # reste valable -> inutile de relancer la détection
+                    gray = cv2.cvtColor(cv2.resize(current_frame, MOTION_GATE_SIZE, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+                    static_scene = (prev_gray is not None
+                                    and current_time - last_detection_time < MOTION_GATE_MAX_SKIP
+                                    and cv2.absdiff(gray, prev_gray).mean() < MOTION_THRESHOLD)
+                    if not static_scene:
+                        detection_count += 1
+                        last_detection_time = current_time
+                        prev_gray = gray
+                        detection_frames.put(current_frame.copy())  # Copie: current_frame reçoit les surimpressions
+                else:
+                    # Not running detection this frame, increment counter
+                    frames_since_last_detection += 1
             
-            # Always draw the bounding box if we have a detection, regardless of auto mode
-            if largest_person_bbox is not None:
-                x1, y1, x2, y2 = largest_person_bbox
+                # Always draw the bounding box if we have a detection, regardless of auto mode
+                if largest_person_bbox is not None:
+                    x1, y1, x2, y2 = largest_person_bbox
                 
-                # Calculate center of bbox
-                center_x = (x1 + x2) // 2
+                    # Calculate center of bbox
+                    center_x = (x1 + x2) // 2
                 
-                # Draw bounding box with varying color based on freshness of detection
-                # Newer detections are bright red, older ones fade to yellow
-                fade_factor = min(1.0, frames_since_last_detection / DETECTION_PERSISTENCE)
-                box_color = (0, int(255 * fade_factor), int(255 * (1-fade_factor)))
+                    # Draw bounding box with varying color based on freshness of detection
+                    # Newer detections are bright red, older ones fade to yellow
+                    fade_factor = min(1.0, frames_since_last_detection / DETECTION_PERSISTENCE)
+                    box_color = (0, int(255 * fade_factor), int(255 * (1-fade_factor)))
                 
-                # Thicker box for newer detections
-                box_thickness = max(1, 3 - int(fade_factor * 2))
+                    # Thicker box for newer detections
+                    box_thickness = max(1, 3 - int(fade_factor * 2))
                 
-                # Draw bounding box
-                cv2.rectangle(current_frame, (x1, y1), (x2, y2), box_color, box_thickness)
+                    # Draw bounding box
+                    cv2.rectangle(current_frame, (x1, y1), (x2, y2), box_color, box_thickness)
                 
-                # Add label with confidence score
-                label = f"TARGET: {last_detection_confidence:.2f}"
-                cv2.putText(current_frame, label, (x1, y1 - 10), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, box_color, box_thickness - 1)
+                    # Add label with confidence score
+                    label = f"TARGET: {last_detection_confidence:.2f}"
+                    hud_scale = current_frame.shape[0] / HUD_REFERENCE_HEIGHT
+                    cv2.putText(current_frame, label, (x1, max(0, y1 - int(10 * hud_scale))), 
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.5 * hud_scale, box_color, max(1, box_thickness - 1))
                 
-                # Only perform tracking actions in auto mode
-                if auto_mode:
-                    # Calculate head position for tracking
-                    # Map image x-coordinate (0-640) to head yaw angle (-60 to 60 degrees)
-                    frame_width = current_frame.shape[1]
-                    head_yaw = ((center_x / frame_width) * 120) - 60
+                    # Only perform tracking actions in auto mode
+                    if auto_mode:
+                        # Calculate head position for tracking
+                        # Map image x-coordinate (0-frame width) to head yaw angle (-60 to 60 degrees)
+                        frame_width = current_frame.shape[1]
+                        head_yaw = ((center_x / frame_width) * 120) - 60
                     
-                    # Move head to track person if IMU is available
-                    if has_imu:
-                        try:
-                            my_dog.head_move([[head_yaw, 0, 0]], speed=300)
-                        except Exception as e:
-                            print(f"Warning: Could not move head: {e}")
+                        # Move head to track person if IMU is available
+                        if has_imu:
+                            try:
+                                my_dog.head_move([[head_yaw, 0, 0]], speed=300)
+                            except Exception as e:
+                                logger.warning("Could not move head: %s", e)
                     
-                    # Get distance using ultrasonic sensor
-                    distance = get_reliable_distance()
-                    if distance is not None:
-                        latest_distance = distance  # Update global variable for web interface
-                        print(f"Target distance: {distance} cm")
+                        # Get distance using ultrasonic sensor
+                        distance = get_cached_distance()
+                        if distance is not None:
+                            if loop_count % LOG_EVERY_N_FRAMES == 0:
+                                logger.info("Target distance: %s cm", distance)
+                            
+                            # Alerte sur front montant uniquement, avec hystérésis pour ne pas la répéter à chaque lecture
+                            if distance < EXPLOSION_DISTANCE:
+                                if not explosion_latched:
+                                    explosion_latched = True
+                                    logger.warning("🔥 TARGET TOO CLOSE! EXPLOSION TRIGGERED! 🔥")
+                            elif distance > EXPLOSION_RESET_DISTANCE:
+                                explosion_latched = False
                         
-                        # Display distance on frame
-                        cv2.putText(current_frame, f"Distance: {latest_distance:.1f} cm", (10, 60), 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+                            # Display distance on frame
+                            draw_hud_text(current_frame, f"Distance: {distance:.1f} cm", (10, 60), 0.7)
                         
-                        # Move toward the person if in auto mode and not too close
-                        if auto_mode and current_time - last_movement_time > 1.5:
-                            last_movement_time = current_time
+                            # Move toward the person if in auto mode and not too close
+                            if auto_mode and current_time - last_movement_time > 1.5:
+                                last_movement_time = current_time
                             
-                            # Person is within pursuit distance - move toward them
-                            if distance < PURSUE_DISTANCE and distance > 15:  # 15cm minimum to avoid collision
-                                print("Pursuing target...")
+                                # Person is within pursuit distance - move toward them
+                                if distance < PURSUE_DISTANCE and distance > 15:  # 15cm minimum to avoid collision
+                                    pursuit_count += 1
+                                    if pursuit_count % LOG_EVERY_N_FRAMES == 1:
+                                        logger.info("Pursuing target... (%d steps)", pursuit_count)
                                 
-                                # First align body with head angle
-                                if abs(head_yaw) > 20:
-                                    # Turn left or right based on head angle
-                                    if head_yaw > 0:
-                                        try:
-                                            my_dog.do_action('turn_left', step_count=1, speed=300)
-                                        except Exception as e:
-                                            print(f"Warning: Could not turn left: {e}")
+                                    # First align body with head angle (turn left or right), otherwise move forward
+                                    if abs(head_yaw) > 20:
+                                        action = 'turn_left' if head_yaw > 0 else 'turn_right'
                                     else:
+                                        action = 'forward'
+                                    
+                                    # Les pas passent par le worker d'actions, comme les commandes manuelles;
+                                    # un nouveau pas n'est demandé qu'une fois le précédent terminé
+                                    if pursuit_idle.is_set():
+                                        pursuit_idle.clear()
+                                        action_queue.put((run_pursuit_step, action))
+                                
+                                    # Bark if close enough
+                                    if distance < BARK_DISTANCE:
                                         try:
-                                            my_dog.do_action('turn_right', step_count=1, speed=300)
+                                            if dog_speak is not None:
+                                                sound_queue.put(('bark',))
+                                            else:
+                                                logger.warning("Speak method not found")
                                         except Exception as e:
-                                            print(f"Warning: Could not turn right: {e}")
-                                else:
-                                    # Move forward
-                                    try:
-                                        my_dog.do_action('forward', step_count=1, speed=300)
-                                    except Exception as e:
-                                        print(f"Warning: Could not move forward: {e}")
-                                
-                                # Bark if close enough
-                                if distance < BARK_DISTANCE:
-                                    try:
-                                        if hasattr(my_dog, 'speak'):
-                                            my_dog.speak('bark', 100)
-                                        else:
-                                            print("Warning: speak method not found")
-                                    except Exception as e:
-                                        print(f"Warning: Could not bark: {e}")
+                                            logger.warning("Could not bark: %s", e)
 
-                                # Check for explosion distance
-                                if distance < EXPLOSION_DISTANCE:
-                                    print("🔥 TARGET TOO CLOSE! EXPLOSION TRIGGERED! 🔥")
-                                    # Create visual explosion effect on the frame
-                                    cv2.rectangle(current_frame, (0, 0), (current_frame.shape[1], current_frame.shape[0]), (0, 0, 255), 20)
-                                    font_scale = 1.5
-                                    text = "⚠️ EXPLOSION ⚠️"
-                                    text_size = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 3)[0]
-                                    text_x = (current_frame.shape[1] - text_size[0]) // 2
-                                    text_y = (current_frame.shape[0] + text_size[1]) // 2
-                                    cv2.putText(current_frame, text, (text_x, text_y), 
-                                            cv2.FONT_HERSHEY_SIMPLEX, font_scale, (0, 255, 255), 3)
-                    else:
-                        print("Could not get valid distance reading")
+                                    # Check for explosion distance
+                                    if distance < EXPLOSION_DISTANCE:
+                                        # Create visual explosion effect on the frame
+                                        draw_explosion_overlay(current_frame)
+                        else:
+                            logger.debug("Could not get valid distance reading")
             
-            # Calculate and display FPS (but not on every frame to save CPU)
-            if current_time - last_fps_display_time >= 1.0:  # Update FPS display once per second
-                fps = frame_count / (current_time - last_fps_display_time)
-                frame_count = 0
-                last_fps_display_time = current_time
+                # Calculate and display FPS (but not on every frame to save CPU)
+                if current_time - last_fps_display_time >= 1.0:  # Update FPS display once per second
+                    fps = frame_count / (current_time - last_fps_display_time)
+                    frame_count = 0
+                    last_fps_display_time = current_time
                 
-                # Display information on frame
-                cv2.putText(current_frame, f"FPS: {fps:.1f}", (10, 30), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+                    # Display information on frame
+                    draw_hud_text(current_frame, f"FPS: {fps:.1f}", (10, 30), 0.7)
                 
-                # Add diagnostic info
-                if args.debug:
-                    # Default diagnostic info
-                    cv2.putText(current_frame, f"Det. interval: {DETECTION_INTERVAL}s", (10, 60), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
-                    cv2.putText(current_frame, f"Conf. threshold: {CONFIDENCE_THRESHOLD}", (10, 80), 
-                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
+                    # Add diagnostic info
+                    if args.debug:
+                        # Default diagnostic info
+                        draw_hud_text(current_frame, f"Det. interval: {DETECTION_INTERVAL}s", (10, 60), 0.5, thickness=1)
+                        draw_hud_text(current_frame, f"Conf. threshold: {CONFIDENCE_THRESHOLD}", (10, 80), 0.5, thickness=1)
                     
-                    # Add cloud API info if enabled
-                    if cloud_api_url:
-                        api_status = "Connected" if cloud_api_success_count > cloud_api_failure_count else "Issues"
-                        cv2.putText(current_frame, f"Cloud API: {api_status} ({cloud_api_success_count}/{cloud_api_success_count+cloud_api_failure_count})", 
-                                   (10, 100), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
+                        # Add cloud API info if enabled
+                        if cloud_api_url:
+                            api_status = "Connected" if cloud_api_success_count > cloud_api_failure_count else "Issues"
+                            draw_hud_text(current_frame, f"Cloud API: {api_status} ({cloud_api_success_count}/{cloud_api_success_count+cloud_api_failure_count})", 
+                                          (10, 100), 0.5, thickness=1)
             
-            # Add status text showing mode
-            mode_text = "AUTO" if auto_mode else "MANUAL"
-            cv2.putText(current_frame, mode_text, (10, 120), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+                # Add status text showing mode
+                mode_text = "AUTO" if auto_mode else "MANUAL"
+                draw_hud_text(current_frame, mode_text, (10, 120), 0.7)
                        
-            # Add IP address and port if web server is running
-            if args.web:
-                ip_text = f"Control: http://{get_local_ip()}:{args.port}"
-                cv2.putText(current_frame, ip_text, (10, 150), 
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+                # Add IP address and port if web server is running
+                if ip_text is not None:
+                    draw_hud_text(current_frame, ip_text, (10, 150), 0.5)
             
-            # Update the frame for web streaming again (with overlays)
-            with lock:
-                outputFrame = current_frame.copy()
+                # Update the frame for web streaming again (with overlays)
+                # publish_frame copie l'image pour l'encodeur: le tampon de travail peut être réutilisé
+                publish_frame(current_frame)
             
-            # Display the frame with detections (unless in headless mode)
-            if not args.headless:
-                try:
-                    cv2.imshow('PiDog Target Tracker', current_frame)
+                # Display the frame with detections (unless in headless mode)
+                if not args.headless:
+                    try:
+                        cv2.imshow('PiDog Target Tracker', current_frame)
                     
-                    # Break the loop if 'q' is pressed
-                    if cv2.waitKey(1) & 0xFF == ord('q'):
-                        break
-                except Exception as e:
-                    print(f"Warning: Could not display frame: {e}")
+                        # Break the loop if 'q' is pressed
+                        if cv2.waitKey(1) & 0xFF == ord('q'):
+                            break
+                    except Exception as e:
+                        logger.warning("Could not display frame: %s", e)
+        except KeyboardInterrupt:
+            print("\nProgram interrupted by user.")
+            shutdown_event.set()
     else:
         # If no camera, just wait for commands via web interface
         print("Running without camera. Use web interface for control.")
         try:
-            while True:
-                # Update distance for web interface
-                distance = get_reliable_distance()
+            while not shutdown_event.is_set():
+                # The distance polling thread keeps latest_distance up to date for the web interface
+                distance = get_cached_distance()
                 if distance is not None:
-                    latest_distance = distance
-                    print(f"Current distance: {latest_distance} cm")
+                    logger.debug("Current distance: %s cm", distance)
                 else:
-                    print("Could not get valid distance reading")
+                    logger.debug("Could not get valid distance reading")
                 
-                time.sleep(0.5)
+                # Sleep until the next reading, waking immediately on shutdown
+                shutdown_event.wait(0.5)
         except KeyboardInterrupt:
             print("\nProgram interrupted by user.")
+            shutdown_event.set()
     
-    # Cleanup
+    # Cleanup: stop the workers before releasing the devices they use
+    shutdown_event.set()
+    stream_frames.put(None)
+    detection_frames.put(None)
+    sound_queue.put(None)
+    if capture_thread is not None:
+        capture_thread.join(timeout=SHUTDOWN_WAIT_TIMEOUT)
     if has_camera and cap is not None:
         cap.release()
     cv2.destroyAllWindows()
     
+    # Abandonner les mouvements en attente, puis laisser celui en cours se terminer
+    # (attente bornée) pour que le 'sit' final ne le chevauche pas
+    while True:
+        try:
+            action_queue.get_nowait()
+        except queue.Empty:
+            break
+    action_queue.put(None)
+    action_thread.join(timeout=SHUTDOWN_WAIT_TIMEOUT)
+    
     # Cleanup PiDog
     try:
         if has_imu:
             my_dog.do_action('sit', speed=300)
-            my_dog.wait_all_done()
-        if has_rgb:
-            my_dog.rgb_strip.set_mode('off', 'black')
+            call_with_timeout(my_dog.wait_all_done)
+        if rgb_set_mode is not None:
+            call_with_timeout(rgb_set_mode, 'off', 'black', timeout=RGB_SHUTDOWN_TIMEOUT)
         my_dog.close()
     except Exception as e:
         print(f"Error during cleanup: {e}")
@@ -1130,32 +1450,66 @@ def index():
     return render_template_string(HTML_TEMPLATE, auto_mode=auto_mode, 
                                  has_camera=has_camera, has_rgb=has_rgb, has_imu=has_imu)
 
-def generate():
-    """Video streaming generator function using simplified approach from test_cam.py"""
-    global outputFrame, lock
+def publish_frame(frame):
+    """Publish a frame for the tracking loop and queue it for the stream encoder"""
+    global outputFrame
+    with lock:
+        outputFrame = frame
     
-    while True:
-        # Wait until a frame is available
-        with lock:
-            if outputFrame is None:
-                time.sleep(0.1)
-                continue
-            
-            # Simple frame encoding
-            try:
-                ret, buffer = cv2.imencode('.jpg', outputFrame)
+    # The encoder gets its own copy: publishers reuse their buffers whether or not it has
+    # finished encoding them (the encoder shares a core with YOLO and can lag behind)
+    # Drop the oldest pending frame rather than letting the encoder fall behind
+    stream_frames.put(frame.copy())
+
+def encode_stream_frames():
+    """Encode published frames to JPEG once, off the capture and tracking threads"""
+    global outputJpeg, outputJpegSeq
+    next_encode_time = 0.0
+    
+    while not shutdown_event.is_set():
+        frame = stream_frames.get()
+        if frame is None:
+            break  # Shutdown sentinel
+        
+        # Limiter l'encodage à STREAM_FPS: les images arrivées trop tôt sont ignorées
+        now = time.monotonic()
+        if now < next_encode_time:
+            continue
+        next_encode_time = now + 1.0 / STREAM_FPS
+        
+        try:
+            if turbo_jpeg is not None:
+                frame_bytes = turbo_jpeg.encode(frame, quality=STREAM_JPEG_QUALITY)
+            else:
+                ret, buffer = cv2.imencode('.jpg', frame, STREAM_JPEG_PARAMS)
                 if not ret:
                     continue
-                
                 frame_bytes = buffer.tobytes()
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-            except Exception as e:
-                print(f"Frame encoding error: {e}")
+            with frame_ready:
+                outputJpeg = frame_bytes
+                outputJpegSeq += 1
+                frame_ready.notify_all()
+        except Exception as e:
+            logger.error("Frame encoding error: %s", e)
+
+STREAM_PART_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'  # Multipart header sent before each JPEG
+
+def generate():
+    """Video streaming generator function forwarding frames encoded by encode_stream_frames"""
+    last_seq = 0  # Sequence number of the last frame sent to this client (0: none yet)
+    while True:
+        # Block until there is a frame this client has not sent yet (the encoder sets the pace, no polling).
+        # A new client gets the current frame right away; a notification missed while yielding is not lost.
+        with frame_ready:
+            if not frame_ready.wait_for(lambda: outputJpegSeq != last_seq, timeout=1.0):
                 continue
+            frame_bytes = outputJpeg
+            last_seq = outputJpegSeq
         
-        # Control streaming rate
-        time.sleep(0.05)
+        # Header, JPEG and trailer are yielded separately so the JPEG is never copied into a new bytes object
+        yield STREAM_PART_HEADER
+        yield frame_bytes
+        yield b'\r\n'
 
 @app.route('/video_feed')
 def video_feed():
@@ -1165,30 +1519,124 @@ def video_feed():
         return Response(generate(),
                       mimetype="multipart/x-mixed-replace; boundary=frame")
     else:
-        print("Camera not available")
+        logger.warning("Camera not available")
         return "No video feed available", 200
 
 @app.route('/distance')
 def get_distance():
-    """API route to get the current distance reading"""
-    global latest_distance
+    """API route to get the current distance reading (null if there is no recent valid reading)"""
+    distance = get_cached_distance()
     # Check if target is within explosion range
-    explosion_warning = latest_distance < EXPLOSION_DISTANCE if latest_distance is not None else False
-    return jsonify({"distance": latest_distance, "explosion_warning": explosion_warning})
+    explosion_warning = distance < EXPLOSION_DISTANCE if distance is not None else False
+    return jsonify({"distance": distance, "explosion_warning": explosion_warning})
 
 @app.route('/toggle_mode')
 def toggle_mode():
     """API route to toggle between auto and manual modes"""
     global auto_mode
     auto_mode = not auto_mode
-    print(f"Mode toggled to: {'auto' if auto_mode else 'manual'}")
+    logger.info("Mode toggled to: %s", 'auto' if auto_mode else 'manual')
     return jsonify({"auto_mode": auto_mode})
 
+def play_sounds():
+    """Play queued sound sequences one after another, until a None sentinel"""
+    while True:
+        sequence = sound_queue.get()
+        if sequence is None:
+            break
+        for i, sound in enumerate(sequence):
+            if i:
+                time.sleep(SOUND_GAP)
+            try:
+                dog_speak(sound, 100)
+            except Exception as e:
+                logger.warning("Could not play sound %s: %s", sound, e)
+
+# Handlers des commandes reçues via /command (chacun renvoie le dict de réponse JSON)
+# Les erreurs matérielles sont journalisées sans trace complète, sauf en mode DEBUG (PIDOG_LOG=DEBUG)
+def handle_aggressive_mode(command, explosion_warning):
+    """Growl, bark and flash the LEDs"""
+    try:
+        if dog_speak is not None:
+            sound_queue.put(('growl', 'bark'))
+        else:
+            logger.warning("speak method not found")
+        if rgb_set_mode is not None:
+            rgb_set_mode('boom', 'red', delay=0.01)
+        logger.info("Aggressive mode activated")
+    except Exception as e:
+        logger.error("Error in aggressive mode: %s", e)
+        logger.debug("Traceback:", exc_info=True)
+    return {"status": "success", "message": "Attack mode activated!", "explosion_warning": explosion_warning}
+
+def handle_bark(command, explosion_warning):
+    """Bark once and flash the LEDs"""
+    try:
+        if dog_speak is not None:
+            sound_queue.put(('bark',))  # Son d'aboiement avec volume maximum
+        else:
+            logger.warning("speak method not found")
+        if rgb_set_mode is not None:
+            rgb_set_mode('boom', 'red', delay=0.01)
+        logger.info("Bark command executed")
+    except Exception as e:
+        logger.error("Error in bark command: %s", e)
+        logger.debug("Traceback:", exc_info=True)
+    return {"status": "success", "message": "Bark command executed", "explosion_warning": explosion_warning}
+
+def run_movement(command):
+    """Run a movement action and wait for it to finish (on the action worker)"""
+    try:
+        logger.info("Executing action: %s", command)
+        result = my_dog.do_action(command, speed=300)
+        my_dog.wait_all_done()
+        logger.info("Action completed with result: %s", result)
+    except Exception as e:
+        logger.error("Error executing command %s: %s", command, e)
+        logger.debug("Traceback:", exc_info=True)
+
+def run_pursuit_step(action):
+    """Run one automatic pursuit step and wait for it to finish (on the action worker)"""
+    try:
+        my_dog.do_action(action, step_count=1, speed=300)
+        my_dog.wait_all_done()
+    except Exception as e:
+        logger.warning("Could not perform %s: %s", action, e)
+    finally:
+        pursuit_idle.set()
+
+def run_actions():
+    """Run queued movement actions one after another, until a None sentinel"""
+    while True:
+        item = action_queue.get()
+        if item is None:
+            break
+        func, arg = item
+        func(arg)
+
+def handle_movement(command, explosion_warning):
+    """Queue a movement action on the action worker (requires the IMU)"""
+    # Ces commandes requièrent l'IMU pour fonctionner correctement
+    if not has_imu:
+        logger.warning("Cannot execute %s - IMU not available", command)
+        return {"status": "error", "message": "IMU not available, movement commands are limited"}
+    
+    # La requête HTTP ne reste pas bloquée pendant que le robot marche
+    action_queue.put((run_movement, command))
+    return {"status": "success", "message": f"Command '{command}' started"}
+
+# Table de dispatch: une seule recherche dans un dict au lieu d'une chaîne if/elif
+MOVE_ACTIONS = frozenset({'forward', 'backward', 'turn_left', 'turn_right'})  # Actions de marche
+POSE_ACTIONS = frozenset({'stand', 'sit'})  # Changements de posture
+COMMAND_HANDLERS = {
+    'aggressive_mode': handle_aggressive_mode,
+    'bark': handle_bark,
+    **dict.fromkeys(MOVE_ACTIONS | POSE_ACTIONS, handle_movement),
+}
+
 @app.route('/command', methods=['POST', 'OPTIONS'])
 def execute_command():
     """API route to execute commands on the PiDog"""
-    global my_dog, has_rgb, has_imu, latest_distance
-    
     # Gérer les requêtes OPTIONS pour CORS
     if request.method == 'OPTIONS':
         return jsonify({"status": "success"}), 200
@@ -1197,77 +1645,31 @@ def execute_command():
         try:
             # Vérifier si la requête contient du JSON
             if not request.is_json:
-                print("Invalid request: No JSON data")
+                logger.warning("Invalid request: No JSON data")
                 return jsonify({"status": "error", "message": "No JSON data provided"}), 400
             
             data = request.get_json()
             command = data.get('command')
             
-            print(f"Received command: {command}")
+            logger.info("Received command: %s", command)
+            
+            if not command:
+                logger.warning("No command provided in request")
+                return jsonify({"status": "error", "message": "No command provided"})
+            
+            handler = COMMAND_HANDLERS.get(command)
+            if handler is None:
+                logger.warning("Unknown command: %s", command)
+                return jsonify({"status": "error", "message": f"Unknown command: {command}"})
             
             # Check for explosion condition
-            explosion_warning = latest_distance < EXPLOSION_DISTANCE if latest_distance is not None else False
+            distance = get_cached_distance()
+            explosion_warning = distance < EXPLOSION_DISTANCE if distance is not None else False
             
-            if command:
-                # Handle special commands
-                if command == 'aggressive_mode':
-                    # Extra aggressive display
-                    try:
-                        if hasattr(my_dog, 'speak'):
-                            my_dog.speak('growl', 100)
-                            time.sleep(0.2)
-                            my_dog.speak('bark', 100)
-                        else:
-                            print("Warning: speak method not found")
-                        if has_rgb:
-                            my_dog.rgb_strip.set_mode('boom', 'red', delay=0.01)
-                        print("Aggressive mode activated")
-                    except Exception as e:
-                        print(f"Error in aggressive mode: {e}")
-                        traceback.print_exc()
-                    return jsonify({"status": "success", "message": "Attack mode activated!", "explosion_warning": explosion_warning})
-                
-                elif command == 'bark':
-                    try:
-                        if hasattr(my_dog, 'speak'):
-                            my_dog.speak('bark', 100)  # Son d'aboiement avec volume maximum
-                        else:
-                            print("Warning: speak method not found")
-                        if has_rgb:
-                            my_dog.rgb_strip.set_mode('boom', 'red', delay=0.01)
-                        print("Bark command executed")
-                    except Exception as e:
-                        print(f"Error in bark command: {e}")
-                        traceback.print_exc()
-                    return jsonify({"status": "success", "message": "Bark command executed", "explosion_warning": explosion_warning})
-                
-                # Handle movement commands - check if IMU is required
-                elif command in ['forward', 'backward', 'turn_left', 'turn_right', 'stand', 'sit']:
-                    # Ces commandes requièrent l'IMU pour fonctionner correctement
-                    if has_imu:
-                        try:
-                            print(f"Executing action: {command}")
-                            result = my_dog.do_action(command, speed=300)
-                            my_dog.wait_all_done()
-                            print(f"Action completed with result: {result}")
-                            return jsonify({"status": "success", "message": f"Command '{command}' executed successfully"})
-                        except Exception as e:
-                            print(f"Error executing command {command}: {e}")
-                            traceback.print_exc()
-                            return jsonify({"status": "error", "message": f"Error executing {command}: {str(e)}"})
-                    else:
-                        print(f"Cannot execute {command} - IMU not available")
-                        return jsonify({"status": "error", "message": "IMU not available, movement commands are limited"})
-                
-                else:
-                    print(f"Unknown command: {command}")
-                    return jsonify({"status": "error", "message": f"Unknown command: {command}"})
-            else:
-                print("No command provided in request")
-                return jsonify({"status": "error", "message": "No command provided"})
+            return jsonify(handler(command, explosion_warning))
         except Exception as e:
-            print(f"Error processing command request: {e}")
-            traceback.print_exc()
+            logger.error("Error processing command request: %s", e)
+            logger.debug("Traceback:", exc_info=True)
             return jsonify({"status": "error", "message": str(e)})
 
 if __name__ == "__main__":
@@ -1284,5 +1686,5 @@ if __name__ == "__main__":
         try:
             if my_dog is not None:
                 my_dog.close()
-        except:
+        except Exception:
             pass 
\ No newline at end of file
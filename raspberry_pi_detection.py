@@ -44,11 +44,19 @@ def main():
         print("Error: Could not open camera.")
         return
     
-    # Set camera properties for better performance
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    # Processing size (width, height)
+    processing_size = (320, 240)
+    
+    # Set camera properties for better performance: ask the driver for the processing size directly
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, processing_size[0])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, processing_size[1])
     cap.set(cv2.CAP_PROP_FPS, 15)  # Lower FPS for Raspberry Pi
     
+    # Check which resolution the driver actually accepted
+    actual_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    actual_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    print(f"Camera resolution: {actual_width}x{actual_height}")
+    
     print("Starting detection. Press 'q' to quit.")
     
     # Main loop
@@ -60,8 +68,9 @@ def main():
             print("Error: Failed to capture image")
             break
             
-        # Optional: Resize frame for faster processing
-        frame = cv2.resize(frame, (320, 240))
+        # Resize only if the driver refused the processing size
+        if (frame.shape[1], frame.shape[0]) != processing_size:
+            frame = cv2.resize(frame, processing_size)
         
         # Measure processing time
         start_time = time.time()